@@ -1,5 +1,5 @@
 from functools import lru_cache
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -7,18 +7,28 @@ class Settings(BaseSettings):
     anthropic_model: str = "claude-sonnet-4-5-20250929"
     anthropic_max_tokens: int = 16000
     anthropic_thinking_budget: int = 10000
+    # None lets the SDK size the read timeout from max_tokens (600s today)
+    anthropic_timeout: float | None = None
+    anthropic_max_retries: int = 2
 
     confidence_threshold: float = 0.25
     max_image_size: int = 2048
     max_upload_mb: int = 50
+    max_batch_images: int = 20
+    response_cache_size: int = 256
+    response_cache_ttl: int = 3600
+    detection_workers: int = 4
     log_level: str = "INFO"
     allowed_origins: str = "*"
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", frozen=True)
 
+    @property
+    def allowed_origins_tuple(self) -> tuple[str, ...]:
+        """ALLOWED_ORIGINS split on commas, ignoring whitespace and empty entries."""
+        return tuple(o.strip() for o in self.allowed_origins.split(",") if o.strip())
 
-@lru_cache
+
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
     return Settings()
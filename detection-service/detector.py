@@ -1,10 +1,21 @@
+import asyncio
 import base64
-import json
+import hashlib
 import logging
+import os
+import re
+import sys
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from functools import lru_cache
 from io import BytesIO
+from typing import IO, get_args
 
+import orjson
 from PIL import Image
+from pydantic import TypeAdapter
 
 try:
     from pillow_heif import register_heif_opener
@@ -12,10 +23,38 @@ try:
 except ImportError:
     pass
 
+# libjpeg-turbo's SIMD encoder is several times faster than the libjpeg build
+# some Pillow wheels ship with; fall back to Pillow when it isn't installed
+try:
+    import numpy as np
+    from turbojpeg import TJPF_RGB, TJSAMP_420, TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _turbo_jpeg = None
+
+# Cache keys only need collision resistance, not cryptographic strength:
+# xxh3 hashes at memory bandwidth; blake2b is the stdlib fallback
+try:
+    from xxhash import xxh3_128 as _new_cache_hash
+except ImportError:
+    def _new_cache_hash():
+        return hashlib.blake2b(digest_size=16)
+
+# pybase64 dispatches to SIMD (AVX2/AVX-512/NEON) codecs; fall back to the stdlib
+try:
+    from pybase64 import b64encode_as_string
+except ImportError:
+    def b64encode_as_string(data) -> str:
+        return base64.b64encode(data).decode("ascii")
+
 import anthropic
+import httpx
+from anthropic.types.messages import MessageBatch
+from anthropic.types.messages.batch_create_params import MessageCreateParamsNonStreaming, Request
 
 from config import Settings
 from models import (
+    Category,
     DetectedObject,
     DetectionResponse,
     DetectionSummary,
@@ -24,9 +63,29 @@ from models import (
 
 logger = logging.getLogger(__name__)
 
+# JPEG start-of-image marker
+JPEG_SOI = b"\xff\xd8\xff"
+
+# Largest JPEG sent unchanged: its base64 (4/3 larger) must stay under the
+# API's 5 MB per-image limit. Bigger files, e.g. q100 or heavy EXIF/XMP, are
+# re-encoded like everything else.
+PASSTHROUGH_MAX_BYTES = 3_500_000
+
+_DETECTIONS_ADAPTER = TypeAdapter(list[DetectedObject])
+_SUMMARY_ADAPTER = TypeAdapter(list[DetectionSummary])
+
+# custom_id given to each Message Batches request: img-<index>-<width>x<height>
+BATCH_CUSTOM_ID = re.compile(r"img-(\d+)-(\d+)x(\d+)")
+
 # Map confidence level strings to numeric scores
 CONFIDENCE_MAP = {"high": 0.95, "medium": 0.75, "low": 0.4}
 
+# The nine grid cells, in reading order
+SECTION_NAMES = tuple(f.name for f in fields(SectionCounts))
+
+# Inventory categories the model may assign; anything else becomes "Uncategorized"
+VALID_CATEGORIES = frozenset(get_args(Category)) - {"Uncategorized"}
+
 SYSTEM_PROMPT = (
     "You are an expert restaurant inventory counter with perfect precision. When counting items, you must:\n"
     "1. Divide the image into a 3x3 grid (9 sections)\n"
@@ -87,12 +146,59 @@ Rules:
 - Group identical products. Do NOT list each unit separately.
 - Empty image = {"items": []}"""
 
+_PROMPT_BLOCK = {"type": "text", "text": VISION_PROMPT}
+
+
+@lru_cache(maxsize=None)
+def get_shared_client(api_key: str, timeout: float | None, max_retries: int) -> anthropic.AsyncAnthropic:
+    """Process-wide Anthropic client backed by one pooled HTTP/2 connection set.
+
+    Every VisionDetector shares it, so concurrent requests reuse keep-alive
+    connections instead of each paying its own TCP/TLS handshakes. Connects
+    fail fast. Without an explicit timeout the client keeps the SDK's
+    DEFAULT_TIMEOUT, which is what lets the SDK derive the read timeout for
+    non-streaming calls from max_tokens.
+    """
+    http_client = anthropic.DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=anthropic.DEFAULT_TIMEOUT if timeout is None else httpx.Timeout(timeout, connect=5.0),
+    )
+    return anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, max_retries=max_retries)
+
+
+def _image_digest(image_file: IO[bytes]) -> bytes:
+    image_file.seek(0)
+    return hashlib.file_digest(image_file, _new_cache_hash).digest()
+
+
+def _base64_source(b64_image: str, media_type: str) -> dict:
+    return {"type": "base64", "media_type": media_type, "data": b64_image}
+
 
 class VisionDetector:
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.client: anthropic.Anthropic | None = None
+        self.client: anthropic.AsyncAnthropic | None = None
         self._ready = False
+        # Recent successful results keyed by (image digest, confidence threshold),
+        # stored with the monotonic time they were cached
+        self._response_cache: OrderedDict[tuple[bytes, float], tuple[float, DetectionResponse]] = OrderedDict()
+        # Bounded pool for hashing/decoding/encoding so a burst of uploads cannot
+        # oversubscribe the CPU the way the default to_thread pool would
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.detection_workers,
+            thread_name_prefix="detect",
+        )
+        self._static_params = {
+            "model": settings.anthropic_model,
+            "max_tokens": settings.anthropic_max_tokens,
+            "system": SYSTEM_PROMPT,
+            "thinking": {
+                "type": "enabled",
+                "budget_tokens": settings.anthropic_thinking_budget,
+            },
+        }
         self._init_client()
 
     def _init_client(self) -> None:
@@ -100,70 +206,157 @@ class VisionDetector:
             logger.error("ANTHROPIC_API_KEY not set")
             return
         try:
-            self.client = anthropic.Anthropic(api_key=self.settings.anthropic_api_key)
+            self.client = get_shared_client(
+                self.settings.anthropic_api_key,
+                self.settings.anthropic_timeout,
+                self.settings.anthropic_max_retries,
+            )
             self._ready = True
-            logger.info(f"Anthropic client initialized, model: {self.settings.anthropic_model}")
+            logger.info("Anthropic client initialized, model: %s", self.settings.anthropic_model)
         except Exception as e:
-            logger.error(f"Failed to initialize Anthropic client: {e}")
+            logger.error("Failed to initialize Anthropic client: %s", e)
+
+    async def warm_up(self) -> None:
+        """Push a small image through preprocessing so the first real upload
+        doesn't pay for PIL plugin loading, codec setup and executor thread start,
+        then open a pooled connection to the API with a token-free model lookup."""
+        # One pixel row wider than max_image_size, so it skips the pass-through
+        # and runs the JPEG decode (draft), the resize and the re-encode
+        with BytesIO() as buffer:
+            Image.new("RGB", (self.settings.max_image_size + 16, 16), (255, 255, 255)).save(buffer, format="JPEG")
+            await self._run_cpu(self._prepare_image, buffer)
+
+        # Startup waits on this, so a stalled API must not hold it for the
+        # full request timeout and retry budget
+        try:
+            await self.client.with_options(timeout=10.0, max_retries=0).models.retrieve(
+                self.settings.anthropic_model
+            )
+        except anthropic.APIError as e:
+            logger.warning("Vision API warm-up request failed: %s", e)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_cpu(self, func, *args):
+        """Run CPU-bound work on the detector's bounded executor."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _prepare_image(self, image_file: IO[bytes]) -> tuple[str, str, int, int]:
+        """Convert to JPEG, resize if needed, return (base64_str, media_type, orig_width, orig_height).
+
+        Reads from a seekable binary file so an upload spooled by the web server is
+        never copied into one big bytes object unless it is sent unchanged.
+        """
+        file_size = image_file.seek(0, os.SEEK_END)
+        image_file.seek(0)
+        is_jpeg = image_file.read(3) == JPEG_SOI
+        image_file.seek(0)
+        image = Image.open(image_file)
+        orig_w, orig_h = image.size
+        max_dim = self.settings.max_image_size
 
-    def _prepare_image(self, image_bytes: bytes) -> tuple[str, str, int, int]:
-        """Convert to JPEG, resize if needed, return (base64_str, media_type, orig_width, orig_height)."""
-        image = Image.open(BytesIO(image_bytes))
+        # Image.open only parses the header, so an RGB JPEG that already fits can
+        # be sent as-is without a decode/re-encode round trip.
+        if (
+            is_jpeg
+            and file_size <= PASSTHROUGH_MAX_BYTES
+            and image.format == "JPEG"
+            and image.mode == "RGB"
+            and max(orig_w, orig_h) <= max_dim
+        ):
+            image_file.seek(0)
+            b64_str = b64encode_as_string(image_file.read())
+            return b64_str, "image/jpeg", orig_w, orig_h
+
+        target = None
+        if max(orig_w, orig_h) > max_dim:
+            scale = max_dim / max(orig_w, orig_h)
+            target = (int(orig_w * scale), int(orig_h * scale))
+            # Let libjpeg downscale by 1/2, 1/4 or 1/8 during the IDCT so oversized
+            # JPEGs are never fully decoded. draft() keeps the image >= target.
+            if image.format == "JPEG":
+                image.draft("RGB", target)
 
         if image.mode in ("RGBA", "P"):
             bg = Image.new("RGB", image.size, (255, 255, 255))
             if image.mode == "RGBA":
-                bg.paste(image, mask=image.split()[3])
+                bg.paste(image, mask=image.getchannel("A"))
             else:
                 bg.paste(image)
             image = bg
         elif image.mode != "RGB":
             image = image.convert("RGB")
 
-        orig_w, orig_h = image.size
-
-        max_dim = self.settings.max_image_size
-        if max(orig_w, orig_h) > max_dim:
-            scale = max_dim / max(orig_w, orig_h)
-            new_w, new_h = int(orig_w * scale), int(orig_h * scale)
-            image = image.resize((new_w, new_h), Image.LANCZOS)
-            logger.info(f"Resized image from {orig_w}x{orig_h} to {new_w}x{new_h}")
+        if target is not None:
+            # reducing_gap lets Pillow box-reduce to ~3x the target before the
+            # LANCZOS pass, which is much cheaper on large downscale factors
+            image.thumbnail((max_dim, max_dim), Image.LANCZOS, reducing_gap=3.0)
+            logger.info("Resized image from %dx%d to %dx%d", orig_w, orig_h, image.width, image.height)
+
+        # 4:2:0 chroma at quality 80 is visually lossless for the vision model and
+        # noticeably smaller; skip Huffman optimization and progressive scans to
+        # keep the encode single-pass.
+        if _turbo_jpeg is not None:
+            jpeg_bytes = _turbo_jpeg.encode(
+                np.asarray(image), quality=80, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420
+            )
+            return b64encode_as_string(jpeg_bytes), "image/jpeg", orig_w, orig_h
 
-        buffer = BytesIO()
-        image.save(buffer, format="JPEG", quality=85)
-        b64_str = base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
+        with BytesIO() as buffer:
+            image.save(buffer, format="JPEG", quality=80, subsampling=2, optimize=False, progressive=False)
+            # Release the zero-copy view and the JPEG buffer before the API call
+            with buffer.getbuffer() as view:
+                b64_str = b64encode_as_string(view)
 
         return b64_str, "image/jpeg", orig_w, orig_h
 
-    def _parse_response(self, text: str, conf_thresh: float) -> list[dict]:
-        """Parse Claude's grid-based JSON response, validate sections, filter by confidence."""
-        cleaned = text.strip()
-        if cleaned.startswith("```"):
-            lines = cleaned.split("\n")
-            cleaned = "\n".join(lines[1:-1]).strip()
-
-        data = json.loads(cleaned)
+    def _parse_response_into(
+        self, text: str, conf_thresh: float
+    ) -> tuple[list[DetectedObject], list[DetectionSummary]]:
+        """Parse Claude's grid-based JSON response, validate sections, filter by confidence.
+
+        Collects plain dicts in one pass, validates each list into response
+        models in a single call and returns (detections, summary).
+        """
+        # Slice from the first "{" to the last "}" — handles bare JSON, markdown
+        # code fences and any chatter around the object in a single pass.
+        start = text.find("{")
+        end = text.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("No JSON object in response")
+
+        data = orjson.loads(text[start:end + 1])
         items = data.get("items", [])
 
-        results = []
+        detections = []
+        summary = []
         for item in items:
             confidence_level = str(item.get("confidence", "medium")).lower()
-            if confidence_level not in CONFIDENCE_MAP:
-                confidence_level = "medium"
-            conf_numeric = CONFIDENCE_MAP[confidence_level]
+            conf_numeric = CONFIDENCE_MAP.get(confidence_level)
+            if conf_numeric is None:
+                confidence_level, conf_numeric = "medium", CONFIDENCE_MAP["medium"]
 
             if conf_numeric < conf_thresh:
                 continue
 
-            sections = item.get("sections", {})
-            section_sum = sum(int(v) for v in sections.values()) if sections else 0
+            raw_sections = item.get("sections") or {}
+            sections = {}
+            section_sum = 0
+            if raw_sections:
+                for name in SECTION_NAMES:
+                    count = int(raw_sections.get(name, 0))
+                    sections[name] = count
+                    section_sum += count
             stated_total = int(item.get("total", 0))
 
             # Trust the section sum over the stated total if they disagree
             if sections and section_sum > 0 and section_sum != stated_total:
                 logger.warning(
-                    f"Section sum {section_sum} != stated total {stated_total} "
-                    f"for '{item.get('class_name')}'. Using section sum."
+                    "Section sum %d != stated total %d for '%s'. Using section sum.",
+                    section_sum,
+                    stated_total,
+                    item.get("class_name"),
                 )
                 total = section_sum
             elif section_sum > 0:
@@ -172,27 +365,99 @@ class VisionDetector:
                 total = max(1, stated_total)
 
             # Validate category against allowed list
-            valid_categories = {"Produce", "Dairy", "Meat", "Seafood", "Dry Goods", "Beverages", "Frozen", "Supplies"}
             raw_category = str(item.get("category", "")).strip()
-            category = raw_category if raw_category in valid_categories else "Uncategorized"
-
-            results.append({
-                "class_name": str(item.get("class_name", "unknown")),
-                "count": total,
+            category = raw_category if raw_category in VALID_CATEGORIES else "Uncategorized"
+
+            # Interned: the same product names recur across responses and
+            # stay alive in the response cache
+            class_name = sys.intern(str(item.get("class_name", "unknown")))
+            notes = item.get("notes")
+            if notes is not None:
+                notes = str(notes)
+            detections.append({
+                "class_name": class_name,
                 "confidence": conf_numeric,
+                "bbox": None,
+                "description": notes,
+            })
+            summary.append({
+                "class_name": class_name,
+                "count": total,
+                "avg_confidence": conf_numeric,
                 "confidence_level": confidence_level,
                 "category": category,
-                "sections": {k: int(v) for k, v in sections.items()} if sections else {},
-                "notes": item.get("notes"),
+                "sections": sections or None,
+                "notes": notes,
                 "needs_review": confidence_level == "low",
             })
-        return results
+        # One validation call per list instead of one model constructor per item
+        return _DETECTIONS_ADAPTER.validate_python(detections), _SUMMARY_ADAPTER.validate_python(summary)
+
+    def _message_params(self, image_source: dict) -> dict:
+        """Build the Messages API parameters shared by single, URL and batch detection.
+
+        Only the image block is new per call; the rest is prebuilt and shared.
+        Nothing here is mutated afterwards, so sharing is safe across concurrent requests.
+        """
+        return {
+            **self._static_params,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": image_source,
+                        },
+                        _PROMPT_BLOCK,
+                    ],
+                }
+            ],
+        }
+
+    @staticmethod
+    def _extract_text(message) -> str:
+        # With extended thinking, response has thinking blocks + text blocks.
+        # Extract the text block containing the JSON.
+        for block in message.content:
+            if block.type == "text":
+                return block.text
+        raise ValueError("No text block in response")
+
+    def _build_response(
+        self,
+        raw_text: str,
+        conf_thresh: float,
+        start_time: float,
+        orig_w: int,
+        orig_h: int,
+    ) -> DetectionResponse:
+        try:
+            detections, summary = self._parse_response_into(raw_text, conf_thresh)
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.error("Failed to parse vision response: %s\nRaw: %.500s", e, raw_text)
+            return DetectionResponse(
+                success=False,
+                error=f"Failed to parse detection results: {e}",
+            )
+
+        processing_time = (time.perf_counter() - start_time) * 1000
+
+        return DetectionResponse(
+            success=True,
+            detections=detections,
+            summary=summary,
+            processing_time_ms=round(processing_time, 1),
+            image_width=orig_w,
+            image_height=orig_h,
+        )
 
-    def detect(
+    async def detect(
         self,
-        image_bytes: bytes,
+        image_file: IO[bytes],
         confidence_threshold: float | None = None,
         filter_inventory: bool = True,
+        include_preview: bool = True,
     ) -> DetectionResponse:
         if not self._ready or self.client is None:
             return DetectionResponse(
@@ -203,101 +468,187 @@ class VisionDetector:
         start_time = time.perf_counter()
         conf_thresh = confidence_threshold or self.settings.confidence_threshold
 
+        # Re-uploads of an unchanged shelf photo skip the vision API entirely.
+        # Cached entries hold no image_preview (it can be megabytes of base64),
+        # so a hit that needs one re-runs the local preprocessing only.
+        cache_key = None
+        if self.settings.response_cache_size > 0:
+            digest = await self._run_cpu(_image_digest, image_file)
+            cache_key = (digest, conf_thresh)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                cached_at, response = cached
+                if time.monotonic() - cached_at <= self.settings.response_cache_ttl:
+                    self._response_cache.move_to_end(cache_key)
+                    logger.info("Returning cached detection result")
+                    update = {}
+                    if include_preview:
+                        try:
+                            update["image_preview"] = (await self._run_cpu(self._prepare_image, image_file))[0]
+                        except Exception as e:
+                            logger.error("Image preparation failed: %s", e)
+                            return DetectionResponse(success=False, error=f"Invalid image: {e}")
+                    processing_time = (time.perf_counter() - start_time) * 1000
+                    update["processing_time_ms"] = round(processing_time, 1)
+                    return response.model_copy(update=update)
+                del self._response_cache[cache_key]
+
+        # PIL releases the GIL while decoding/encoding, so preprocessing on the
+        # executor keeps the event loop free for other requests' API calls.
         try:
-            b64_image, media_type, orig_w, orig_h = self._prepare_image(image_bytes)
+            b64_image, media_type, orig_w, orig_h = await self._run_cpu(self._prepare_image, image_file)
         except Exception as e:
-            logger.error(f"Image preparation failed: {e}")
+            logger.error("Image preparation failed: %s", e)
             return DetectionResponse(success=False, error=f"Invalid image: {e}")
 
         try:
-            message = self.client.messages.create(
-                model=self.settings.anthropic_model,
-                max_tokens=self.settings.anthropic_max_tokens,
-                system=SYSTEM_PROMPT,
-                thinking={
-                    "type": "enabled",
-                    "budget_tokens": self.settings.anthropic_thinking_budget,
-                },
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": media_type,
-                                    "data": b64_image,
-                                },
-                            },
-                            {
-                                "type": "text",
-                                "text": VISION_PROMPT,
-                            },
-                        ],
-                    }
-                ],
+            message = await self.client.messages.create(
+                **self._message_params(_base64_source(b64_image, media_type))
             )
-            # With extended thinking, response has thinking blocks + text blocks.
-            # Extract the text block containing the JSON.
-            raw_text = None
-            for block in message.content:
-                if block.type == "text":
-                    raw_text = block.text
-                    break
-            if raw_text is None:
-                raise ValueError("No text block in response")
+            raw_text = self._extract_text(message)
         except anthropic.APIError as e:
-            logger.error(f"Anthropic API error: {e}")
+            logger.error("Anthropic API error: %s", e)
             return DetectionResponse(success=False, error=f"Vision API error: {e.message}")
         except Exception as e:
-            logger.error(f"Vision API call failed: {e}")
+            logger.error("Vision API call failed: %s", e)
             return DetectionResponse(success=False, error=f"Vision API call failed: {e}")
 
-        try:
-            parsed_items = self._parse_response(raw_text, conf_thresh)
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-            logger.error(f"Failed to parse vision response: {e}\nRaw: {raw_text[:500]}")
+        result = self._build_response(raw_text, conf_thresh, start_time, orig_w, orig_h)
+        if result.success and cache_key is not None:
+            self._response_cache[cache_key] = (time.monotonic(), result)
+            if len(self._response_cache) > self.settings.response_cache_size:
+                self._response_cache.popitem(last=False)
+        if include_preview:
+            result = result.model_copy(update={"image_preview": b64_image})
+        return result
+
+    async def detect_from_url(
+        self,
+        url: str,
+        confidence_threshold: float | None = None,
+    ) -> DetectionResponse:
+        """Detect items in an already-hosted image, letting Anthropic fetch it by URL.
+
+        Skips the local decode/resize and base64 payload entirely. The image
+        dimensions are unknown to the service, so width/height are reported as 0.
+        """
+        if not self._ready or self.client is None:
             return DetectionResponse(
                 success=False,
-                error=f"Failed to parse detection results: {e}",
+                error="Vision API client not initialized. Check ANTHROPIC_API_KEY.",
             )
 
-        detections = []
-        summary = []
-        for item in parsed_items:
-            detections.append(DetectedObject(
-                class_name=item["class_name"],
-                class_id=0,
-                confidence=item["confidence"],
-                bbox=None,
-                description=item.get("notes"),
-            ))
-            summary.append(DetectionSummary(
-                class_name=item["class_name"],
-                count=item["count"],
-                avg_confidence=item["confidence"],
-                confidence_level=item["confidence_level"],
-                category=item.get("category", "Uncategorized"),
-                sections=SectionCounts(**item["sections"]) if item.get("sections") else None,
-                notes=item.get("notes"),
-                needs_review=item.get("needs_review", False),
-            ))
+        start_time = time.perf_counter()
+        conf_thresh = confidence_threshold or self.settings.confidence_threshold
 
-        total_objects = sum(item["count"] for item in parsed_items)
-        processing_time = (time.perf_counter() - start_time) * 1000
+        try:
+            message = await self.client.messages.create(
+                **self._message_params({"type": "url", "url": url})
+            )
+            raw_text = self._extract_text(message)
+        except anthropic.APIError as e:
+            logger.error("Anthropic API error: %s", e)
+            return DetectionResponse(success=False, error=f"Vision API error: {e.message}")
+        except Exception as e:
+            logger.error("Vision API call failed: %s", e)
+            return DetectionResponse(success=False, error=f"Vision API call failed: {e}")
 
-        return DetectionResponse(
-            success=True,
-            detections=detections,
-            summary=summary,
-            total_objects=total_objects,
-            processing_time_ms=round(processing_time, 1),
-            image_width=orig_w,
-            image_height=orig_h,
-            image_preview=b64_image,
+        return self._build_response(raw_text, conf_thresh, start_time, 0, 0)
+
+    async def submit_batch(self, images: list[IO[bytes]]) -> MessageBatch:
+        """Submit images to the Message Batches API and return the created batch.
+
+        Each request's custom_id carries its upload index and original image size
+        (``img-<index>-<width>x<height>``) so results can be rebuilt statelessly.
+        Raises ValueError if any image cannot be prepared.
+        """
+        if not self._ready or self.client is None:
+            raise RuntimeError("Vision API client not initialized. Check ANTHROPIC_API_KEY.")
+
+        prepared = await asyncio.gather(
+            *(self._run_cpu(self._prepare_image, image_file) for image_file in images),
+            return_exceptions=True,
         )
 
+        requests = []
+        for i, result in enumerate(prepared):
+            if isinstance(result, Exception):
+                raise ValueError(f"Invalid image at index {i}: {result}") from result
+            b64_image, media_type, orig_w, orig_h = result
+            requests.append(Request(
+                custom_id=f"img-{i}-{orig_w}x{orig_h}",
+                params=MessageCreateParamsNonStreaming(
+                    **self._message_params(_base64_source(b64_image, media_type))
+                ),
+            ))
+
+        batch = await self.client.messages.batches.create(requests=requests)
+        logger.info("Submitted message batch %s with %d images", batch.id, len(requests))
+        return batch
+
+    async def batch_results(
+        self,
+        batch_id: str,
+        confidence_threshold: float | None = None,
+    ) -> tuple[MessageBatch, list[DetectionResponse]]:
+        """Return the batch and, once processing has ended, one response per image in upload order.
+
+        processing_time_ms on these results covers only parsing each entry
+        locally; batch queueing and generation time are not known per request.
+        Raises ValueError for a batch whose requests were not submitted by submit_batch.
+        """
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return batch, []
+
+        conf_thresh = confidence_threshold or self.settings.confidence_threshold
+        results: dict[int, DetectionResponse] = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            start_time = time.perf_counter()
+            match = BATCH_CUSTOM_ID.fullmatch(entry.custom_id)
+            if match is None:
+                raise ValueError(f"Batch {batch_id} was not created by this service")
+            index, orig_w, orig_h = (int(v) for v in match.groups())
+
+            if entry.result.type != "succeeded":
+                error = getattr(entry.result, "error", None)
+                detail = error.error.message if error is not None else entry.result.type
+                results[index] = DetectionResponse(
+                    success=False,
+                    error=f"Vision API batch request {entry.result.type}: {detail}",
+                    image_width=orig_w,
+                    image_height=orig_h,
+                )
+                continue
+
+            try:
+                raw_text = self._extract_text(entry.result.message)
+            except ValueError as e:
+                results[index] = DetectionResponse(
+                    success=False,
+                    error=f"Vision API call failed: {e}",
+                    image_width=orig_w,
+                    image_height=orig_h,
+                )
+                continue
+            results[index] = self._build_response(raw_text, conf_thresh, start_time, orig_w, orig_h)
+
+        return batch, [results[i] for i in sorted(results)]
+
+    async def detect_batch(
+        self,
+        images: list[IO[bytes]],
+        confidence_threshold: float | None = None,
+        poll_interval: float = 10.0,
+    ) -> list[DetectionResponse]:
+        """Submit a batch and wait until it ends. Intended for offline/bulk scans."""
+        batch = await self.submit_batch(images)
+        while True:
+            batch, results = await self.batch_results(batch.id, confidence_threshold)
+            if batch.processing_status == "ended":
+                return results
+            await asyncio.sleep(poll_interval)
+
     @property
     def is_loaded(self) -> bool:
         return self._ready
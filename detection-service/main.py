@@ -1,109 +1,284 @@
+"""Inventory detection HTTP API.
+
+Response classes: JSON bodies are small and fully built in memory, so they go
+out as a single ORJSONResponse (the app default) or a plain Response with
+pre-encoded bytes. Any binary result that is bounded, such as an annotated
+image, should be encoded in memory and returned as a plain Response as well.
+StreamingResponse is only for output of unknown or unbounded length, because
+it costs an extra event-loop round trip per chunk.
+"""
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-import traceback
+from contextlib import asynccontextmanager
 from typing import Annotated
 
+import orjson
 from fastapi import FastAPI, File, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 
 from config import get_settings
-from models import DetectionResponse, HealthResponse
+from models import (
+    BatchResultsResponse,
+    BatchSubmitResponse,
+    DetectionResponse,
+    DetectUrlRequest,
+    HealthResponse,
+)
 
 settings = get_settings()
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue log records untouched.
+
+    The stock prepare() merges args and renders tracebacks on the calling
+    thread so records can be pickled. This queue never leaves the process,
+    so all formatting is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Request handlers only enqueue log records; a listener thread formats them
+# and does the blocking write to stdout.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+log_listener = logging.handlers.QueueListener(_log_queue, _stdout_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=getattr(logging, settings.log_level), handlers=[DeferredQueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
 
 detector = None
 detector_error = None
 
 
-def get_detector():
+async def init_detector() -> None:
+    """Build the detector and warm it before the app starts taking requests.
+
+    detector (and with it anthropic, PIL, pillow_heif, turbojpeg) is imported
+    here rather than at module level so importing this module stays cheap.
+    """
     global detector, detector_error
-    if detector is not None:
-        return detector
-    if detector_error is not None:
-        return None
+    if not settings.anthropic_api_key:
+        detector_error = "ANTHROPIC_API_KEY environment variable is not set"
+        logger.error(detector_error)
+        return
+
     try:
         from detector import VisionDetector
         detector = VisionDetector(settings)
-        logger.info("Detector initialized successfully")
-        return detector
     except Exception as e:
         detector_error = str(e)
-        logger.error(f"Failed to initialize detector: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception("Failed to initialize detector: %s", e)
+        return
+
+    if detector.is_loaded:
+        await detector.warm_up()
+        logger.info("Vision detector initialized successfully")
+    else:
+        logger.warning("Detector failed to initialize: vision API client not ready")
+
+
+def require_detector():
+    if detector is None or not detector.is_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Detection model not available: {detector_error or 'unknown error'}",
+        )
+    return detector
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting detection service...")
+    await init_detector()
+    yield
+    if detector is not None:
+        detector.close()
+
+
+# ISO-BMFF brands written by HEIC/HEIF encoders (iPhone camera uploads)
+HEIF_BRANDS = (b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1")
+
+
+def sniff_image_type(image: UploadFile) -> str | None:
+    """Identify the image format from its magic bytes.
+
+    content_type is whatever the client claims, so junk uploads are rejected
+    before anything is decoded. The usual camera formats are matched from the
+    first 12 bytes; anything else (BMP, TIFF, AVIF, ...) is accepted if
+    Pillow can identify it, which only parses the header.
+    """
+    image.file.seek(0)
+    header = image.file.read(12)
+    image.file.seek(0)
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[4:8] == b"ftyp" and header[8:12] in HEIF_BRANDS:
+        return "heif"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+
+    from PIL import Image
+
+    try:
+        with Image.open(image.file) as img:
+            return img.format.lower()
+    except Exception:
         return None
+    finally:
+        image.file.seek(0)
+
+
+def upload_size(image: UploadFile) -> int:
+    """Size of an upload in bytes without reading it into memory."""
+    if image.size is not None:
+        return image.size
+    size = image.file.seek(0, os.SEEK_END)
+    image.file.seek(0)
+    return size
 
 
 app = FastAPI(
     title="Inventory Detection API",
     description="Claude Vision-powered product detection for restaurant inventory",
     version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Allowance for multipart boundaries and part headers around the image
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Cap the request body of uploads to one path while it streams in.
+
+    The multipart form is spooled before the endpoint runs, so the size check
+    inside /detect would only fire after the whole body had been received.
+    Requests are rejected up front from Content-Length, and chunked bodies are
+    cut off with a 413 as soon as the running total passes the limit.
+    """
+
+    def __init__(self, app, path: str, max_body: int, detail: str):
+        self.app = app
+        self.path = path
+        self.max_body = max_body
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body:
+            response = JSONResponse(status_code=413, content={"detail": self.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# Added before CORS so a 413 still carries CORS headers
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path="/detect",
+    max_body=settings.max_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+    detail=f"Image too large. Maximum size is {settings.max_upload_mb}MB",
+)
+
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path="/detect/batch",
+    max_body=settings.max_batch_images * (settings.max_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES),
+    detail=f"Batch too large. Maximum is {settings.max_batch_images} images of {settings.max_upload_mb}MB each",
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins.split(","),
+    allow_origins=settings.allowed_origins_tuple,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    global detector_error
-    logger.info("Starting detection service...")
-
-    if not settings.anthropic_api_key:
-        detector_error = "ANTHROPIC_API_KEY environment variable is not set"
-        logger.error(detector_error)
-        return
-
-    det = get_detector()
-    if det and det.is_loaded:
-        logger.info("Vision detector initialized successfully")
-    else:
-        logger.warning(f"Detector failed to initialize: {detector_error}")
-
-
 @app.get("/")
 async def root():
     return {"status": "ok"}
 
 
+# (detector state, encoded body) of the last /health response
+_health_cache: tuple[tuple, bytes] | None = None
+
+
 @app.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
-    return HealthResponse(
-        status="healthy" if detector_error is None and detector is not None else "error",
-        model_loaded=detector is not None and detector.is_loaded,
-        model_name=settings.anthropic_model,
-        version="2.0.0",
-    )
+async def health_check() -> Response:
+    """Liveness/readiness probe.
+
+    Detector state only changes at startup, so the body is encoded once per
+    state and reused for every probe after that.
+    """
+    global _health_cache
+    model_loaded = detector is not None and detector.is_loaded
+    key = (detector is not None, model_loaded, detector_error)
+    if _health_cache is None or _health_cache[0] != key:
+        body = HealthResponse(
+            status="healthy" if detector_error is None and detector is not None else "error",
+            model_loaded=model_loaded,
+            model_name=settings.anthropic_model,
+            version="2.0.0",
+        )
+        _health_cache = (key, orjson.dumps(body.model_dump()))
+    return Response(_health_cache[1], media_type="application/json")
+
+
+# Parts of /debug that cannot change while the process is running
+_DEBUG_STATIC = {
+    "backend": "claude-vision",
+    "anthropic_model": settings.anthropic_model,
+    "api_key_set": bool(settings.anthropic_api_key),
+    "working_directory": os.getcwd(),
+    "python_version": sys.version,
+}
 
 
 @app.get("/debug")
 async def debug_info():
     """Debug endpoint to diagnose issues."""
     return {
-        "backend": "claude-vision",
-        "anthropic_model": settings.anthropic_model,
-        "api_key_set": bool(settings.anthropic_api_key),
+        **_DEBUG_STATIC,
         "detector_loaded": detector is not None,
         "detector_is_loaded": detector.is_loaded if detector else False,
         "detector_error": detector_error,
-        "working_directory": os.getcwd(),
-        "python_version": sys.version,
     }
 
 
-@app.post("/detect", response_model=DetectionResponse)
+@app.post("/detect", response_model=DetectionResponse, response_model_exclude_none=True)
 async def detect_objects(
     image: Annotated[UploadFile, File(description="Image file to analyze")],
     confidence: Annotated[
@@ -114,13 +289,12 @@ async def detect_objects(
         bool,
         Query(description="Filter to inventory-relevant items only"),
     ] = True,
+    include_preview: Annotated[
+        bool,
+        Query(description="Include the base64 JPEG preview of the analyzed image"),
+    ] = True,
 ) -> DetectionResponse:
-    det = get_detector()
-    if det is None or not det.is_loaded:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Detection model not available: {detector_error or 'unknown error'}",
-        )
+    det = require_detector()
 
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(
@@ -129,21 +303,26 @@ async def detect_objects(
         )
 
     max_bytes = settings.max_upload_mb * 1024 * 1024
-    content = await image.read()
+    size = upload_size(image)
 
-    if len(content) > max_bytes:
+    if size > max_bytes:
         raise HTTPException(
             status_code=413,
             detail=f"Image too large. Maximum size is {settings.max_upload_mb}MB",
         )
 
-    if len(content) < 100:
+    if size < 100:
         raise HTTPException(status_code=400, detail="Image file appears to be empty")
 
-    result = det.detect(
-        image_bytes=content,
+    if sniff_image_type(image) is None:
+        raise HTTPException(status_code=400, detail="Unsupported or corrupt image file")
+
+    # Hand the spooled upload straight to the detector; PIL reads only what it needs
+    result = await det.detect(
+        image_file=image.file,
         confidence_threshold=confidence,
         filter_inventory=filter_inventory,
+        include_preview=include_preview,
     )
 
     if not result.success:
@@ -152,14 +331,116 @@ async def detect_objects(
     return result
 
 
+@app.post("/detect/url", response_model=DetectionResponse, response_model_exclude_none=True)
+async def detect_objects_from_url(
+    request: DetectUrlRequest,
+    confidence: Annotated[
+        float | None,
+        Query(ge=0.1, le=1.0, description="Minimum confidence threshold"),
+    ] = None,
+) -> DetectionResponse:
+    """Analyze an already-hosted image by URL instead of uploading its bytes."""
+    det = require_detector()
+
+    result = await det.detect_from_url(str(request.url), confidence_threshold=confidence)
+
+    if not result.success:
+        raise HTTPException(status_code=422, detail=result.error)
+
+    return result
+
+
+@app.post("/detect/batch", response_model=BatchSubmitResponse)
+async def submit_batch(
+    images: Annotated[list[UploadFile], File(description="Image files to analyze")],
+) -> BatchSubmitResponse:
+    """Submit many images for asynchronous detection via the Message Batches API.
+
+    Returns a batch handle; poll GET /detect/batch/{batch_id} for results.
+    """
+    det = require_detector()
+
+    # Checked before any image is prepared, so an oversized batch costs no CPU
+    if len(images) > settings.max_batch_images:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many images. Maximum is {settings.max_batch_images} per batch",
+        )
+
+    max_bytes = settings.max_upload_mb * 1024 * 1024
+    for image in images:
+        if not image.content_type or not image.content_type.startswith("image/"):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid content type for {image.filename}: {image.content_type}. Expected image/*",
+            )
+        size = upload_size(image)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image {image.filename} too large. Maximum size is {settings.max_upload_mb}MB",
+            )
+        if size < 100:
+            raise HTTPException(status_code=400, detail=f"Image file {image.filename} appears to be empty")
+        if sniff_image_type(image) is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported or corrupt image file: {image.filename}")
+
+    from anthropic import APIError
+
+    try:
+        batch = await det.submit_batch([image.file for image in images])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except APIError as e:
+        raise HTTPException(status_code=502, detail=f"Vision API error: {e.message}")
+
+    return BatchSubmitResponse(
+        batch_id=batch.id,
+        status=batch.processing_status,
+        image_count=len(images),
+    )
+
+
+@app.get("/detect/batch/{batch_id}", response_model=BatchResultsResponse, response_model_exclude_none=True)
+async def get_batch_results(
+    batch_id: str,
+    confidence: Annotated[
+        float | None,
+        Query(ge=0.1, le=1.0, description="Minimum confidence threshold"),
+    ] = None,
+) -> BatchResultsResponse:
+    det = require_detector()
+
+    from anthropic import APIError, NotFoundError
+
+    try:
+        batch, results = await det.batch_results(batch_id, confidence_threshold=confidence)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except APIError as e:
+        raise HTTPException(status_code=502, detail=f"Vision API error: {e.message}")
+
+    return BatchResultsResponse(
+        batch_id=batch.id,
+        status=batch.processing_status,
+        results=results,
+    )
+
+
+# Static payload, serialized once at import
+_CLASSES_JSON = orjson.dumps({
+    "backend": "claude-vision",
+    "note": "Claude Vision identifies products by brand, size, and type. No fixed class list.",
+    "examples": [
+        "Coca-Cola 12oz can",
+        "Heinz Ketchup 20oz bottle",
+        "Budweiser 12-pack",
+    ],
+})
+
+
 @app.get("/classes")
-async def get_supported_classes() -> dict:
-    return {
-        "backend": "claude-vision",
-        "note": "Claude Vision identifies products by brand, size, and type. No fixed class list.",
-        "examples": [
-            "Coca-Cola 12oz can",
-            "Heinz Ketchup 20oz bottle",
-            "Budweiser 12-pack",
-        ],
-    }
+async def get_supported_classes() -> Response:
+    return Response(_CLASSES_JSON, media_type="application/json")
@@ -1,15 +1,36 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from functools import cached_property
 
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, computed_field
+from pydantic.dataclasses import dataclass
+from typing import Literal, Optional
 
-class BoundingBox(BaseModel):
+ConfidenceLevel = Literal["high", "medium", "low"]
+
+# Inventory categories the model may assign, plus the fallback for anything else
+Category = Literal[
+    "Produce", "Dairy", "Meat", "Seafood", "Dry Goods", "Beverages", "Frozen", "Supplies",
+    "Uncategorized",
+]
+
+# Response models are built once by the detector and never mutated. Core
+# schemas are built on first use rather than at import. Unknown keys are
+# ignored, not forbidden, so serialized computed fields (class_id,
+# total_objects) still validate when a response is read back.
+RESPONSE_CONFIG = ConfigDict(frozen=True, defer_build=True)
+
+
+# Leaf value types are slotted dataclasses: no per-instance __dict__, and
+# they validate faster than a BaseModel of the same shape
+@dataclass(slots=True, config=RESPONSE_CONFIG)
+class BoundingBox:
     x1: float = Field(description="Left coordinate")
     y1: float = Field(description="Top coordinate")
     x2: float = Field(description="Right coordinate")
     y2: float = Field(description="Bottom coordinate")
 
 
-class SectionCounts(BaseModel):
+@dataclass(slots=True, config=RESPONSE_CONFIG)
+class SectionCounts:
     """Grid-based count breakdown — image divided into 3x3 sections."""
     top_left: int = 0
     top_center: int = 0
@@ -23,38 +44,82 @@ class SectionCounts(BaseModel):
 
 
 class DetectedObject(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     class_name: str = Field(description="Detected item name")
-    class_id: int = Field(default=0, description="Class ID (legacy, always 0 for vision API)")
     confidence: float = Field(ge=0, le=1, description="Detection confidence")
     bbox: Optional[BoundingBox] = Field(default=None, description="Bounding box coordinates (null for vision API)")
     description: Optional[str] = Field(default=None, description="Additional product details")
 
+    @computed_field(description="Class ID (legacy, always 0 for vision API)")
+    @property
+    def class_id(self) -> int:
+        return 0
+
+
+class DetectUrlRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    url: HttpUrl = Field(description="Publicly reachable http(s) URL of the image to analyze")
+
 
 class DetectionSummary(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     class_name: str
     count: int
     avg_confidence: float
-    confidence_level: str = Field(default="medium", description="high, medium, or low")
-    category: str = Field(default="Uncategorized", description="Suggested inventory category")
+    confidence_level: ConfidenceLevel = Field(default="medium", description="high, medium, or low")
+    category: Category = Field(default="Uncategorized", description="Suggested inventory category")
     sections: Optional[SectionCounts] = Field(default=None, description="3x3 grid count breakdown")
     notes: Optional[str] = Field(default=None, description="Counting challenges or unclear areas")
     needs_review: bool = Field(default=False, description="True if low confidence — flag for manual review")
 
 
 class DetectionResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     success: bool
     detections: list[DetectedObject] = Field(default_factory=list)
     summary: list[DetectionSummary] = Field(default_factory=list)
-    total_objects: int = 0
     processing_time_ms: float = 0
     image_width: int = 0
     image_height: int = 0
     error: Optional[str] = None
     image_preview: Optional[str] = Field(default=None, description="Base64 JPEG preview of the processed image")
 
+    @computed_field(description="Sum of the per-item counts in summary")
+    @cached_property
+    def total_objects(self) -> int:
+        return sum(item.count for item in self.summary)
+
 
 class HealthResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
     status: str
     model_loaded: bool
     model_name: str
     version: str
+
+
+class BatchSubmitResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
+    batch_id: str
+    status: str = Field(description="Message batch processing status: in_progress, canceling, or ended")
+    image_count: int
+
+
+class BatchResultsResponse(BaseModel):
+    model_config = RESPONSE_CONFIG
+
+    batch_id: str
+    status: str = Field(description="Message batch processing status: in_progress, canceling, or ended")
+    results: list[DetectionResponse] = Field(
+        default_factory=list,
+        description=(
+            "One result per submitted image in upload order (empty until the batch has ended). "
+            "processing_time_ms is local parse time only"
+        ),
+    )
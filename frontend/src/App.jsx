@@ -21,6 +21,8 @@ const QR_SCANNER_FPS = 10;
 const DEFAULT_ANALYTICS_DAYS = 30;
 const MS_PER_DAY = 86400000;
 const MIN_PASSWORD_LENGTH = 6;
+// Upload types every supported browser renders natively; anything else needs the server's JPEG preview
+const BROWSER_DISPLAYABLE_TYPES = new Set(['image/jpeg', 'image/png', 'image/webp', 'image/gif']);
 
 import { useState, useEffect, useRef, useCallback, Component } from 'react';
 import { Html5Qrcode } from 'html5-qrcode';
@@ -3223,7 +3225,7 @@ function DetectView({ onAddToInventory }) {
     tempCanvas.toBlob(blob => {
       if (blob) {
         setCapturedImage(URL.createObjectURL(blob));
-        runDetection(blobToFile(blob, 'capture.jpg'));
+        runDetection(blobToFile(blob, 'capture.jpg'), { includePreview: false });
       } else {
         setError('Failed to capture image. Please try again.');
       }
@@ -3244,16 +3246,20 @@ function DetectView({ onAddToInventory }) {
       setIsHeicUpload(false);
       setCapturedImage(URL.createObjectURL(file));
     }
-    runDetection(file);
+    runDetection(file, { includePreview: isHeic || !BROWSER_DISPLAYABLE_TYPES.has(file.type) });
   };
 
-  const runDetection = async (file) => {
+  const runDetection = async (file, { includePreview = true } = {}) => {
     setIsDetecting(true);
     setError(null);
     setDetectionResult(null);
 
     try {
-      const result = await detectObjects(file, { confidence: DETECTION_CONFIDENCE, filterInventory: true });
+      const result = await detectObjects(file, {
+        confidence: DETECTION_CONFIDENCE,
+        filterInventory: true,
+        includePreview,
+      });
       setDetectionResult(result);
 
       // Populate editable items from detection results
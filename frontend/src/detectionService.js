@@ -28,11 +28,12 @@ export class DetectionError extends Error {
  * @param {Object} options - Detection options
  * @param {number} options.confidence - Minimum confidence threshold (0.0-1.0)
  * @param {boolean} options.filterInventory - Only return inventory-relevant items
+ * @param {boolean} options.includePreview - Return a JPEG preview of the analyzed image
  * @returns {Promise<Object>} Detection response with items, counts, and confidence scores
  * @throws {DetectionError} On network failure or server error
  */
 export async function detectObjects(imageFile, options = {}) {
-  const { confidence = 0.25, filterInventory = true } = options;
+  const { confidence = 0.25, filterInventory = true, includePreview = true } = options;
 
   if (!DETECTION_API_URL) {
     throw new DetectionError('Detection service not configured. Set VITE_DETECTION_API_URL environment variable.', 503);
@@ -44,6 +45,7 @@ export async function detectObjects(imageFile, options = {}) {
   const params = new URLSearchParams();
   if (confidence) params.set('confidence', confidence.toString());
   if (filterInventory !== undefined) params.set('filter_inventory', filterInventory.toString());
+  if (!includePreview) params.set('include_preview', 'false');
 
   const url = `${DETECTION_API_URL}/detect?${params}`;
 